@@ -3,64 +3,60 @@
 # Jacob Feder 3/13/2021
 
 import numpy as np
-import datetime
+import pandas as pd
 import calendar
-import csv
-import types
+from dataclasses import dataclass, field
+from typing import Callable
+from multiprocessing import Pool
+from pathlib import Path
 import matplotlib.pyplot as plt
+from numba import njit # conda install numba
 
 # simulation time step size (hr)
 time_step = 1
 
+@dataclass(slots=True)
 class SolarPanel:
-    def __init__(self, name, power_stc, tcp, degradation, nmot, efficiency):
-        """simulates a solar panel"""
-        # string identifier
-        self.name = name
-        # power output (kW) (initial condition is at rated standard test condition)
-        self.power = power_stc
-        # temperature coefficient of power (1/C, negative)
-        self.tcp = tcp
-        # annual degradation rate (unitless, positive)
-        self.degradation = degradation
-        # nominal module operating temperature
-        self.nmot = nmot
-        # efficiency of non-panel electronics (inverter, other losses)
-        self.efficiency = efficiency
-
+    """simulates a solar panel"""
+    # string identifier
+    name: str
+    # power output (kW) at rated standard test condition (before any degradation)
+    power: float
+    # temperature coefficient of power (1/C, negative)
+    tcp: float
+    # annual degradation rate (unitless, positive)
+    degradation: float
+    # nominal module operating temperature
+    nmot: float
+    # efficiency of non-panel electronics (inverter, other losses)
+    efficiency: float
+
+@dataclass(slots=True)
 class Battery:
-    def __init__(self, name, capacity, max_power, efficiency):
-        """simulates a battery"""
-        # string identifier
-        self.name = name
-        # useable capacity (kWh)
-        self.capacity = capacity
-        # inverter max power rating continuous (kW)
-        self.max_power = max_power
-        # battery round-trip efficiency
-        self.efficiency = efficiency
-        # current state of charge (unitless, 0-1)
-        self.soc = 0
-
+    """simulates a battery"""
+    # string identifier
+    name: str
+    # useable capacity (kWh)
+    capacity: float
+    # inverter max power rating continuous (kW)
+    max_power: float
+    # battery round-trip efficiency
+    efficiency: float
+
+@dataclass(slots=True)
 class EnergyPlan:
-    def __init__(self, name, usage_cost, total_cost):
-        """simulates an energy usage plan"""
-        # string identifier
-        self.name = name
-        # reset state variables
-        self.reset()
-        # function that updates the usage cost for a single hour
-        self.calc_usage_cost = types.MethodType(usage_cost, self)
-        # function that calculates the total cost of the plan for the simulated period
-        self.calc_total_cost = types.MethodType(total_cost, self)
-
-    def reset(self):
-        # peak power usage at any point in the simulated period (kW) (used in E-27 plan)
-        self.peak = 0
-        # peak power usage (during peak hours) for each simulated day (kWh) (used in E-15 plan)
-        self.daily_peaks = []
-        # accumulated usage cost in the past billing period
-        self.usage_cost = 0
+    """simulates an energy usage plan"""
+    # string identifier
+    name: str
+    # rate ($/kWh) for importing energy from the grid indexed by [month, hour, weekday]
+    import_rates: np.ndarray = field(compare=False)
+    # rate ($/kWh) for exporting energy to the grid indexed by [month, hour, weekday]
+    export_rates: np.ndarray = field(compare=False)
+    # on-peak hours used for the daily peak usage (used in E-15 plan) indexed by [month, hour, weekday]
+    peak_mask: np.ndarray = field(compare=False)
+    # function that calculates the total cost of the plan for a billing period
+    # given its month, usage cost, and average daily on-peak usage
+    calc_total_cost: Callable = field(compare=False)
 
 def kelvin(c):
     """convert C to K"""
@@ -71,8 +67,9 @@ def celsius(k):
     return k - 273.15
 
 # TODO unverified
-def solar_sim(panel, irr, temp_a):
-    """calculate the energy output (kWh) of a solar panel in a single time step"""
+@njit(cache=True)
+def solar_sim(power, efficiency, tcp, irr, temp_a):
+    """calculate the energy output (kWh) of a solar panel with the given (degraded) power in a single time step"""
     # irradiance at standard test conditions (kW/m^2)
     irr_stc = 1.0
     # standard test condition temperature (C)
@@ -89,147 +86,218 @@ def solar_sim(panel, irr, temp_a):
     temp_p = 40
     # power output calculation
     # https://www.homerenergy.com/products/pro/docs/latest/how_homer_calculates_the_pv_array_power_output.html
-    pout = panel.power * panel.efficiency * irr / irr_stc * (1 + panel.tcp * (temp_p - temp_stc))
-    # calculate new solar panel efficiency considering degradation rate
-    panel.power = panel.power * (1 - panel.degradation / (24*365))
+    pout = power * efficiency * irr / irr_stc * (1 + tcp * (temp_p - temp_stc))
 
     return pout * time_step
 
-def battery_sim(battery, e_sys):
-    """calculate the battery state of charge and any residual energy at a single time step;
+@njit(cache=True)
+def run_year(irr, temp_a, load, month, hour, weekday, last_hour_of_month,
+             power_stc, p_eff, p_tcp, degradation, capacity, max_power, b_eff,
+             import_rates, export_rates, peak_mask):
+    """simulate a solar panel, battery and energy plan together in a single pass over the time steps
+    (the panel degradation and the energy stored in the battery carry over between time steps);
+    returns the usage cost and the average daily on-peak energy usage (kWh) of each billing period,
+    which ends at the last time step of a month;
     this only simulates 'stupid' batteries that use a greedy algorithm (no time-of-use optimization)"""
 
+    # panel power output (kW) (initial condition is at rated standard test condition)
+    power = power_stc
     # account for inverter max continuous power
-    battery_emax = battery.max_power * time_step
-    # energy returned after interaction with the battery
-    e_resid = 0
-    if e_sys > battery_emax:
-        # extra energy not affected by the battery
-        e_resid = e_sys - battery_emax
+    battery_emax = max_power * time_step
+    # energy stored in the battery (kWh)
+    e_stored = 0.0
+
+    num_bills = last_hour_of_month.sum()
+    usage_costs = np.zeros(num_bills)
+    average_peaks = np.zeros(num_bills)
+    # index of the current billing period
+    bill = 0
+    # accumulated usage cost in the current billing period
+    usage_cost = 0.0
+    # sum of the daily peaks and number of days in the current billing period
+    peak_sum = 0.0
+    num_days = 0
+    # peak energy usage during on-peak hours of the current day (kWh)
+    daily_peak = 0.0
+
+    for i in range(len(load)):
+        # energy input/output to/from the battery
+        e_sys = solar_sim(power, p_eff, p_tcp, irr[i], temp_a[i]) - load[i]
+        # calculate new solar panel power considering degradation rate
+        power *= 1 - degradation / (24*365)
+
         # remaining rate-limited energy due to inverter limitation
-        e_sys = battery_emax
-    elif e_sys < -battery_emax:
-        e_resid = e_sys - battery_emax
-        e_sys = -battery_emax
-
-    # total energy available to the battery in this time step
-    e_tot = battery.soc * battery.capacity + e_sys
-    if e_tot > battery.capacity:
-        battery.soc = 1.0
-        return e_resid + battery.efficiency * (e_tot - battery.capacity)
-    elif e_tot < 0.0:
-        battery.soc = 0.0
-        return e_resid + e_tot
-    else:
-        if battery.capacity != 0:
-            battery.soc = e_tot / battery.capacity
-        return e_resid
+        e_batt = min(max(e_sys, -battery_emax), battery_emax)
+        # total energy available to the battery in this time step
+        e_tot = e_stored + e_batt
+        e_stored = min(max(e_tot, 0.0), capacity)
+        # energy returned after interaction with the battery: extra energy not affected by the battery,
+        # energy that didn't fit in a full battery, and energy that an empty battery couldn't provide
+        e_resid = (e_sys - e_batt) + b_eff * max(e_tot - capacity, 0.0) + min(e_tot, 0.0)
+        # energy input/output from/to the grid
+        grid_energy = -e_resid
+
+        # usage cost of importing/exporting energy from/to the grid
+        m, h, w = month[i], hour[i], weekday[i]
+        usage_cost += max(grid_energy, 0.0) * import_rates[m, h, w] + min(grid_energy, 0.0) * export_rates[m, h, w]
+        if peak_mask[m, h, w]:
+            daily_peak = max(daily_peak, grid_energy)
+        # end of the day
+        if h == 23:
+            peak_sum += daily_peak
+            num_days += 1
+            daily_peak = 0.0
+        # end of the billing period
+        if last_hour_of_month[i]:
+            usage_costs[bill] = usage_cost
+            average_peaks[bill] = peak_sum / num_days
+            bill += 1
+            usage_cost = 0.0
+            peak_sum = 0.0
+            num_days = 0
+
+    return usage_costs, average_peaks
+
+def strip_quotes(filename):
+    """write a copy of a data file with its quotation marks removed next to it (<name>.clean.csv)
+    and return the path of the copy; an existing copy is reused if it is newer than the file"""
+    path = Path(filename)
+    clean_path = path.with_suffix('.clean.csv')
+    if not clean_path.exists() or clean_path.stat().st_mtime < path.stat().st_mtime:
+        # write to a temporary file first so an interrupted write doesn't leave a partial copy behind
+        tmp_path = clean_path.with_suffix('.tmp')
+        with open(path) as f, open(tmp_path, 'w') as clean_f:
+            for line in f:
+                clean_f.write(line.replace('"', ''))
+        tmp_path.replace(clean_path)
+    return clean_path
+
+def simulate_combo(panel, battery, plan, irradiance, temp, load, month, hour, weekday, last_hour_of_month):
+    """simulate a single equipment combination over the whole simulated period;
+    returns the results key and an array of the monthly bills"""
+    # bind the equipment parameters to local names once; the kernel only takes plain scalars and arrays
+    # (always as floats so the kernel is only compiled for a single signature)
+    p_stc, p_eff, p_tcp, p_deg = float(panel.power), float(panel.efficiency), float(panel.tcp), float(panel.degradation)
+    b_cap, b_pmax, b_eff = float(battery.capacity), float(battery.max_power), float(battery.efficiency)
+    usage_costs, average_peaks = run_year(irradiance, temp, load, month, hour, weekday, last_hour_of_month,
+                                          p_stc, p_eff, p_tcp, p_deg, b_cap, b_pmax, b_eff,
+                                          plan.import_rates, plan.export_rates, plan.peak_mask)
+    # month of each billing period
+    bill_months = month[last_hour_of_month]
+    monthly_bills = np.zeros(len(usage_costs))
+    for i in range(len(monthly_bills)):
+        monthly_bills[i] = plan.calc_total_cost(bill_months[i], usage_costs[i], average_peaks[i])
+    return f'{panel.name}:{battery.name}:{plan.name}', monthly_bills
 
 ###############
 # parameters
 ###############
 
+def rate_lut(rate):
+    """tabulate an hourly rate function for every (month, hour, weekday); the month axis
+    has 13 entries so the table can be indexed directly by month number (1-12)"""
+    return np.array([[[rate(month, hour, weekday) for weekday in range(7)]
+                                                  for hour in range(24)]
+                                                  for month in range(13)])
+
 # https://www.srpnet.com/prices/pdfx/april2015/e13.pdf
-def e13_usage(self, time, energy):
-    """calculate the hourly cost of the SRP E-13 plan (ignores special holiday hours)"""
-    # importing energy from the grid
-    if energy > 0:
-        # summer (peak)
-        if time.month == 7 or time.month == 8:
-            # on-peak hours weekdays 2pm-8pm
-            if time.hour >= 14 and time.hour < 20 and time.weekday() < 5:
-                self.usage_cost += energy * 0.2409
-            # off-peak hours
-            else:
-                self.usage_cost += energy * 0.0730
-        # winter
-        elif time.month <= 4 or time.month >= 11:
-            # on-peak hours weekdays 2pm-8pm
-            if ((time.hour >= 5 and time.hour < 9) or (time.hour >= 17 and time.hour < 21)) and time.weekday() < 5:
-                self.usage_cost += energy * 0.0951
-            # off-peak hours
-            else:
-                self.usage_cost += energy * 0.0691
-        # summer
+def e13_rate(month, hour, weekday):
+    """hourly rate ($/kWh) for importing energy under the SRP E-13 plan (ignores special holiday hours)"""
+    # summer (peak)
+    if month == 7 or month == 8:
+        # on-peak hours weekdays 2pm-8pm
+        if hour >= 14 and hour < 20 and weekday < 5:
+            return 0.2409
+        # off-peak hours
         else:
-            # on-peak hours weekdays 2pm-8pm
-            if time.hour >= 14 and time.hour < 20 and time.weekday() < 5:
-                self.usage_cost += energy * 0.2094
-            # off-peak hours
-            else:
-                self.usage_cost += energy * 0.0727
-    # exporting energy to the grid
+            return 0.0730
+    # winter
+    elif month <= 4 or month >= 11:
+        # on-peak hours weekdays 5am-9am, 5pm-9pm
+        if ((hour >= 5 and hour < 9) or (hour >= 17 and hour < 21)) and weekday < 5:
+            return 0.0951
+        # off-peak hours
+        else:
+            return 0.0691
+    # summer
     else:
-        self.usage_cost += energy * 0.0281
+        # on-peak hours weekdays 2pm-8pm
+        if hour >= 14 and hour < 20 and weekday < 5:
+            return 0.2094
+        # off-peak hours
+        else:
+            return 0.0727
 
-def e13_total(self, time):
-    """calculate the cost of the SRP E13 plan for the simulated period"""
+# E-13 import rate ($/kWh) indexed by [month, hour, weekday]
+E13_IMPORT = rate_lut(e13_rate)
+# E-13 export rate ($/kWh) (energy exported to the grid is credited at a flat rate)
+E13_EXPORT = rate_lut(lambda month, hour, weekday: 0.0281)
+# E-13 has no daily peak charge
+E13_PEAK_MASK = rate_lut(lambda month, hour, weekday: False)
+
+def e13_total(month, usage_cost, average_peak):
+    """calculate the cost of the SRP E13 plan for a billing period"""
     service_charge = 32.44
-    if self.usage_cost > 0.0:
-        total_cost = service_charge + self.usage_cost
+    if usage_cost > 0.0:
+        total_cost = service_charge + usage_cost
     else:
         total_cost = service_charge
-    self.reset()
     return total_cost
 
 # https://www.srpnet.com/prices/pdfx/april2015/e15.pdf
-def e15_usage(self, time, energy):
-    """calculate the hourly cost of the SRP E13 plan (ignores special holiday hours)"""
-    if time.hour == 0:
-        self.daily_peaks.append(0.0)
+def e15_rate(month, hour, weekday):
+    """hourly rate ($/kWh) under the SRP E-15 plan and whether the hour is on-peak (ignores special holiday hours)"""
     # summer (peak)
-    if time.month == 7 or time.month == 8:
+    if month == 7 or month == 8:
         # on-peak hours weekdays 2pm-8pm
-        if time.hour >= 14 and time.hour < 20 and time.weekday() < 5:
-            self.usage_cost += energy * 0.0622
-            if energy > self.daily_peaks[-1]:
-                self.daily_peaks[-1] = energy
+        if hour >= 14 and hour < 20 and weekday < 5:
+            return 0.0622, True
         # off-peak hours
         else:
-            self.usage_cost += energy * 0.0412
+            return 0.0412, False
     # winter
-    elif time.month <= 4 or time.month >= 11:
-        # on-peak hours weekdays 2pm-8pm
-        if ((time.hour >= 5 and time.hour < 9) or (time.hour >= 17 and time.hour < 21)) and time.weekday() < 5:
-            self.usage_cost += energy * 0.0410
-            if energy > self.daily_peaks[-1]:
-                self.daily_peaks[-1] = energy
+    elif month <= 4 or month >= 11:
+        # on-peak hours weekdays 5am-9am, 5pm-9pm
+        if ((hour >= 5 and hour < 9) or (hour >= 17 and hour < 21)) and weekday < 5:
+            return 0.0410, True
         # off-peak hours
         else:
-            self.usage_cost += energy * 0.0370
+            return 0.0370, False
     # summer
     else:
         # on-peak hours weekdays 2pm-8pm
-        if time.hour >= 14 and time.hour < 20 and time.weekday() < 5:
-            self.usage_cost += energy * 0.0462
-            if energy > self.daily_peaks[-1]:
-                self.daily_peaks[-1] = energy
+        if hour >= 14 and hour < 20 and weekday < 5:
+            return 0.0462, True
         # off-peak hours
         else:
-            self.usage_cost += energy * 0.0360
+            return 0.0360, False
 
-def e15_total(self, time):
-    """calculate the cost of the SRP E15 plan for the simulated billing period"""
+# E-15 rate ($/kWh) indexed by [month, hour, weekday]
+E15_RATE = rate_lut(lambda month, hour, weekday: e15_rate(month, hour, weekday)[0])
+# E-15 on-peak hours indexed by [month, hour, weekday]
+E15_PEAK_MASK = rate_lut(lambda month, hour, weekday: e15_rate(month, hour, weekday)[1])
+
+def e15_total(month, usage_cost, average_peak):
+    """calculate the cost of the SRP E15 plan for a billing period"""
     service_charge = 32.44
 
     # calculate average daily peak charge
     # summer (peak)
-    if time.month == 7 or time.month == 8:
-        average_peak_charge = np.mean(self.daily_peaks) * 21.94
+    if month == 7 or month == 8:
+        average_peak_charge = average_peak * 21.94
     # winter
-    elif time.month <= 4 or time.month >= 11:
-        average_peak_charge = np.mean(self.daily_peaks) * 19.29
+    elif month <= 4 or month >= 11:
+        average_peak_charge = average_peak * 19.29
     # summer
     else:
-        average_peak_charge = np.mean(self.daily_peaks) * 8.13
+        average_peak_charge = average_peak * 8.13
 
     # calculate total charge
-    if self.usage_cost + average_peak_charge > 0.0:
-        total_cost = service_charge + self.usage_cost + average_peak_charge
+    if usage_cost + average_peak_charge > 0.0:
+        total_cost = service_charge + usage_cost + average_peak_charge
     else:
         total_cost = service_charge
 
-    self.reset()
     return total_cost
 
 # TODO
@@ -246,8 +314,8 @@ panels = [SolarPanel('None', 0, 0, 0, 0, 0),
 batteries = [Battery('None', 0, 0, 0),
              Battery('Tesla', 13.5, 5, 0.9)]
 
-plans = [EnergyPlan('E13', e13_usage, e13_total),\
-         EnergyPlan('E15', e15_usage, e15_total)]#,\
+plans = [EnergyPlan('E13', E13_IMPORT, E13_EXPORT, E13_PEAK_MASK, e13_total),\
+         EnergyPlan('E15', E15_RATE, E15_RATE, E15_PEAK_MASK, e15_total)]#,\
          #EnergyPlan('E27', e27_usage, e27_total)]
 
 # solar irradiance data file
@@ -267,78 +335,76 @@ num_years = 1
 # simulation
 ###############
 
-# remove quotation marks from the files
-for filename in [weather_data_filename, load_data_filename]:
-    with open(filename, 'r+') as f:
-        data = f.read()
-        f.seek(0)
-        f.write(data.replace('"', ''))
-        f.truncate()
-
-# simulation results
-results = {}
-
-with open(weather_data_filename, newline='') as solar_data_file,\
-     open(load_data_filename, newline='') as load_data_file:
-    # import solar irradiance data
-    solar_data = list(csv.reader(solar_data_file))[18:-1]
+if __name__ == '__main__':
+    # remove quotation marks from the files
+    weather_data_path = strip_quotes(weather_data_filename)
+    load_data_path = strip_quotes(load_data_filename)
+
+    # import solar irradiance data (a header row after the site info, then 8760 hourly rows and a totals row);
+    # only the columns used by the simulation are parsed
+    weather = pd.read_csv(weather_data_path, skiprows=17, nrows=8760,
+                          usecols=['Month', 'Day', 'Hour', 'Ambient Temperature (C)', 'Plane of Array Irradiance (W/m^2)'])
     # import energy usage data from utility
-    load_data = list(csv.reader(load_data_file))[1:]
-    # iterate over all possible equipment combinations
-    for panel in panels:
-        for battery in batteries:
-            for plan in plans:
-                monthly_bills = []
-                today = datetime.date(year, 1, 1)
-                end_date = datetime.date(year + num_years, 1, 1)
-                while today < end_date:
-                    # day index (1-366)
-                    day_idx = today.timetuple().tm_yday
-
-                    load_data_today = load_data[day_idx]
-                    # load data looks like ['1/1/2020', '12:0 am', '1.2']
-                    load_data_time = datetime.strptime(f'{load_data_now[0]} {load_data_now[1]}', '%m/%d/%Y %I:%M %p')
-                    if load_data_time.timetuple().tm_yday != day_idx:
-                        #
-                        solar_data_now = solar_data[i]
-
-                        raise ValueError('solar and utility date/time mismatch')
-
-                    # Plane of Array Irradiance (kW/m^2)
-                    irradiance = float(solar_data_now[7]) / 1000.0
-                    # ambient temperature (C)
-                    temp = float(solar_data_now[5])
-                    # month number (1-12)
-                    month = int(solar_data_now[0])
-                    # day number of month (1-31)
-                    day = int(solar_data_now[1])
-                    # hour of the day (1-24)
-                    hour = int(solar_data_now[2])
-                    # today as a date object
-                    solar_data_time = datetime(year, month, day, hour, minute=0)
-
-                    load = float(load_data_now[2])
-
-                    # calculate energy input/output from/to the grid
-                    grid_energy = - battery_sim(battery, solar_sim(panel, irradiance, temp) - load)
-                    plan.calc_usage_cost(load_data_time, grid_energy)
-                    # if it's the last time step of the month, calculate the bill
-                    if day == calendar.monthrange(year, month)[1] and hour == 23:
-                        monthly_bills.append(plan.calc_total_cost(load_data_time))
-                    today += datetime.timedelta(days=1)
-                results[f'{panel.name}:{battery.name}:{plan.name}'] = monthly_bills
-
-for r in results:
-    total = np.sum(results[r])
-    monthly_mean = np.mean(results[r])
-    print(f'{r} mean bill: {monthly_mean:.2f} total: {total:.2f}')
-    # import pdb; pdb.set_trace()
-
-import pdb; pdb.set_trace()
-plot_name = 'LG:None:E13'
-np.arange(1,len(results[r]), 1)
-plt.bar(list(range(len(results[r]))) + 1, results[r], color='green')
-plt.xlabel('Month')
-plt.ylabel('Cost')
-plt.title(plot_name)
-plt.show()
+    # load data looks like ['1/1/2020', '12:0 am', '1.2']
+    load_data = pd.read_csv(load_data_path, usecols=[0, 1, 2])
+    load_data_time = pd.to_datetime(load_data.iloc[:, 0] + ' ' + load_data.iloc[:, 1], format='%m/%d/%Y %I:%M %p')
+    # the irradiance data is for a typical (non-leap) year, so skip any leap day in the utility data
+    is_leap_day = (load_data_time.dt.month == 2) & (load_data_time.dt.day == 29)
+    load_data = load_data[~is_leap_day]
+    load_data_time = load_data_time[~is_leap_day]
+    if len(weather) != len(load_data):
+        raise ValueError('solar and utility date/time mismatch')
+
+    # Plane of Array Irradiance (kW/m^2)
+    irradiance = weather['Plane of Array Irradiance (W/m^2)'].to_numpy() / 1000.0
+    # ambient temperature (C)
+    temp = weather['Ambient Temperature (C)'].to_numpy()
+    # month number (1-12)
+    month = weather['Month'].to_numpy()
+    # day number of month (1-31)
+    day = weather['Day'].to_numpy()
+    # hour of the day (0-23)
+    hour = weather['Hour'].to_numpy()
+    # energy usage (kWh)
+    load = load_data.iloc[:, 2].to_numpy()
+
+    if np.any(month != load_data_time.dt.month) or \
+       np.any(day != load_data_time.dt.day) or \
+       np.any(hour != load_data_time.dt.hour):
+        raise ValueError('solar and utility date/time mismatch')
+
+    # repeat the same data for each simulated year
+    irradiance = np.tile(irradiance, num_years)
+    temp = np.tile(temp, num_years)
+    load = np.tile(load, num_years)
+    # year of each time step
+    sim_year = np.repeat(year + np.arange(num_years), len(month))
+    month = np.tile(month, num_years)
+    day = np.tile(day, num_years)
+    hour = np.tile(hour, num_years)
+    # day of the week (0-6, Monday is 0) of each time step
+    weekday = pd.to_datetime(pd.DataFrame({'year': sim_year, 'month': month, 'day': day})).dt.weekday.to_numpy(dtype=np.int8)
+    # whether each time step is the last one of its month (the irradiance data has no leap days)
+    days_in_month = np.array(calendar.mdays)
+    last_hour_of_month = (day == days_in_month[month]) & (hour == 23)
+
+    # iterate over all possible equipment combinations; each one is simulated independently
+    sim_data = (irradiance, temp, load, month, hour, weekday, last_hour_of_month)
+    tasks = [(panel, battery, plan, *sim_data) for panel in panels for battery in batteries for plan in plans]
+    with Pool() as pool:
+        # simulation results
+        results = dict(pool.starmap(simulate_combo, tasks))
+
+    for r in results:
+        total = np.sum(results[r])
+        monthly_mean = np.mean(results[r])
+        print(f'{r} mean bill: {monthly_mean:.2f} total: {total:.2f}')
+
+    plot_name = 'LG:None:E13'
+    # month number (starting at 1) of each bill
+    x = np.arange(1, len(results[plot_name]) + 1)
+    plt.bar(x, results[plot_name], color='green')
+    plt.xlabel('Month')
+    plt.ylabel('Cost')
+    plt.title(plot_name)
+    plt.show()
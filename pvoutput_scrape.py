@@ -1,18 +1,17 @@
 # scrape data from pvoutput.org
 
 from pathlib import Path
-import time
+import asyncio
 import datetime
 import csv
 import random
 
-from selenium import webdriver # conda install selenium
-from bs4 import BeautifulSoup # conda install beautifulsoup4
+import aiohttp # conda install aiohttp
+import lxml.html # conda install lxml
+import numpy as np
 
 from pvoutput_user_info import user_pass
 
-headless = True
-
 # sid of solar data set e.g. sid = '64456' for
 # AZ Panasonic 330 + Enphase 7.920kW
 # https://pvoutput.org/intraday.jsp?id=72624&sid=64456
@@ -20,87 +19,99 @@ sid = '64456'
 
 # data file
 filename = 'solar_data.csv'
+# directory for the data of each day (days that are already there are skipped when restarting)
+day_data_dir = Path('solar_data')
 
 # pvoutput.org login page
 login_url = 'https://pvoutput.org/login.jsp'
 
-# firefox selenium driver
-driver_path = Path(__file__).resolve().parent / 'geckodriver'
-# set headless mode
-head_option = webdriver.FirefoxOptions()
-if headless:
-    head_option.add_argument('-headless')
-# start driver
-driver = webdriver.Firefox(executable_path='./geckodriver', options=head_option)
-
-# navigate to the login URL
-driver.get(login_url)
-# fill in account info
-username, password = user_pass() # function that returns ('pvoutput username', 'pvoutput password')
-login_form = driver.find_element_by_id('login')
-login_form.send_keys(username)
-login_form = driver.find_element_by_id('password')
-login_form.send_keys(password)
-# login
-login_form.submit()
-# wait for page load
-time.sleep(1.0)
+# number of days to download at the same time
+concurrent_requests = 4
+
+async def fetch_day(session, semaphore, today):
+    """download the intraday data of a single day; returns an array of the sum of the reported
+    powers in each hour of the day"""
+    url = f'https://pvoutput.org/intraday.jsp?id=0&sid={sid}&dt={today.year}{today.month:02}{today.day - 1:02}&gs=0&m=1'
+
+    async with semaphore:
+        async with session.get(url) as response:
+            html = await response.text()
+        # wait to prevent rate-limiting
+        await asyncio.sleep(6 + random.uniform(0, 0.5))
+
+    table = lxml.html.fromstring(html).xpath('//*[@id="tbl_main"]')
+    if not table:
+        # the captcha got us
+        print(today)
+        raise RuntimeError(f'no data table found on {url}')
+
+    # sum of the different powers in each hour of the day
+    hourly_sum = np.zeros(24)
+    for row in table[0].xpath('.//tr'):
+        # collect the text value of each column in the row
+        cols = [col.text_content() for col in row.xpath('td')]
+        if len(cols) == 12:
+            # hour of data point
+            hour = int(cols[1].split(':')[0])
+            # power during this period
+            try:
+                power = float(cols[4].replace('W', '').replace(',', ''))
+            except:
+                power = 0
+            hourly_sum[hour] += power
+    return hourly_sum
+
+def day_data_path(today):
+    """path of the data file of a single day"""
+    return day_data_dir / f'{today:%Y%m%d}.csv'
+
+def save_day(today, hourly_sum):
+    """write the average power of each hour of a single day to its own data file"""
+    # average of data points over the hour (unreported times assumed 0)
+    hourly_power = hourly_sum / (60/data_interval)
+    day_rows = [(today.year, today.month, today.day, i, power) for i, power in enumerate(hourly_power.tolist())]
+    # write to a temporary file first so an interrupted write doesn't leave a partial day behind
+    path = day_data_path(today)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', newline='') as csvfile:
+        csv.writer(csvfile, delimiter=',').writerows(day_rows)
+    tmp_path.replace(path)
+
+async def download_day(session, semaphore, today):
+    """download the intraday data of a single day and save it"""
+    save_day(today, await fetch_day(session, semaphore, today))
+
+async def scrape(days):
+    """login to pvoutput.org and download the intraday data of each day"""
+    async with aiohttp.ClientSession() as session:
+        # fill in account info
+        username, password = user_pass() # function that returns ('pvoutput username', 'pvoutput password')
+        # login (the session keeps the login cookies for the data requests)
+        async with session.post(login_url, data={'login': username, 'password': password}) as response:
+            response.raise_for_status()
+            html = await response.text()
+        # a failed login returns the login page again instead of an error status
+        if lxml.html.fromstring(html).xpath('//*[@id="login" or @id="password"]'):
+            raise RuntimeError(f'pvoutput.org login failed (still on the login form at {response.url}); '
+                               'check the username and password')
+        # limit the number of requests in flight at once
+        semaphore = asyncio.Semaphore(concurrent_requests)
+        await asyncio.gather(*(download_day(session, semaphore, today) for today in days))
 
 year = 2020
 # start date of data to collect
-today = datetime.date(year, 1, 1)
+start_date = datetime.date(year, 1, 1)
 # end date of data to collect
 end_date = datetime.date(year + 1, 1, 1)
 # interval between data points (min)
 data_interval = 5
-# iterate through live data and save it to a csv file
-with open(filename, 'w') as csvfile:
-    csvwriter = csv.writer(csvfile, delimiter=',')
-    while today < end_date:
-        url = f'https://pvoutput.org/intraday.jsp?id=0&sid={sid}&dt={today.year}{today.month:02}{today.day - 1:02}&gs=0&m=1'
-
-        # navigate to data url
-        driver.get(url)
-        try:
-            table = driver.find_element_by_id('tbl_main')
-        except Exception as e:
-            # the captcha got us
-            print(today)
-            raise e
-        table_html = table.get_attribute('innerHTML')
-
-        # parse html table data
-        soup = BeautifulSoup(table_html, 'html.parser')
-        # keys: hours of the day, values: array of different powers in that hour
-        power_data = {}
-        for row in soup.find_all('tr'):
-            # iterate through each column in the row and collect it's text value
-            cols = []
-            for col in row.find_all('td'):
-                cols.append(col.get_text())
-            if len(cols) == 12:
-                # hour of data point
-                hour = int(cols[1].split(':')[0])
-                # power during this period
-                try:
-                    power = float(cols[4].replace('W', '').replace(',', ''))
-                except:
-                    power = 0
-                if hour not in power_data:
-                    power_data[hour] = []
-                power_data[hour].append(power)
-        # average power data for each hour of the day
-        for i in range(24):
-            hourly_power = '0'
-            if i in power_data:
-                # average of data points over the hour (unreported times assumed 0)
-                hourly_power = str(sum(power_data[i]) / (60/data_interval))
-            # write data to the file
-            csvwriter.writerow([today.year, today.month, today.day, i, hourly_power])
-        # wait to prevent rate-limiting
-        time.sleep(6 + random.uniform(0, 0.5))
-        # move on to the next day
-        today += datetime.timedelta(days=1)
 
-# close webdriver
-driver.close()
+days = [start_date + datetime.timedelta(days=i) for i in range((end_date - start_date).days)]
+# only download the days that haven't been saved yet
+day_data_dir.mkdir(exist_ok=True)
+asyncio.run(scrape([today for today in days if not day_data_path(today).exists()]))
+
+# combine the data of all the days into a single csv file
+with open(filename, 'w', buffering=1 << 20) as csvfile:
+    for today in days:
+        csvfile.write(day_data_path(today).read_text())